@@ -11,8 +11,8 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
 
-# Import database config (this also loads .env.local)
-from src.database import Base, clean_url, ssl_context
+# Import database config (settings are loaded from .env.local)
+from src.database import Base, clean_url, get_ssl_context
 from src.models import User, Rule  # noqa: F401
 
 # this is the Alembic Config object, which provides
@@ -66,7 +66,7 @@ async def run_async_migrations() -> None:
     connectable = create_async_engine(
         clean_url,
         poolclass=pool.NullPool,
-        connect_args={"ssl": ssl_context}
+        connect_args={"ssl": get_ssl_context()}
     )
 
     async with connectable.connect() as connection:
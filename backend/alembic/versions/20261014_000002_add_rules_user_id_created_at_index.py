@@ -0,0 +1,34 @@
+"""Replace rules user_id index with (user_id, created_at)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-14 00:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The composite index covers every lookup the single-column one served
+    op.create_index(
+        'ix_rules_user_id_created_at',
+        'rules',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+    op.drop_index(op.f('ix_rules_user_id'), table_name='rules')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_rules_user_id'), 'rules', ['user_id'], unique=False)
+    op.drop_index('ix_rules_user_id_created_at', table_name='rules')
@@ -0,0 +1,107 @@
+"""
+Redis-backed cache for serialized per-user responses.
+
+Caching is disabled when REDIS_URL is not set. Redis errors are logged and
+treated as cache misses so an unavailable cache never fails a request.
+"""
+
+import logging
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait on Redis before treating the call as a cache miss. Kept
+# well under a second so an unreachable host degrades to database reads
+# instead of stalling every request that touches the cache.
+_CACHE_TIMEOUT = 0.25
+
+redis_client: Redis | None = (
+    Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=_CACHE_TIMEOUT,
+        socket_timeout=_CACHE_TIMEOUT,
+        retry_on_timeout=False,
+    )
+    if settings.REDIS_URL
+    else None
+)
+
+
+def rules_generation_key(user_id: int) -> str:
+    """Key of the counter bumped on every change to a user's rules."""
+    return f"rules:{user_id}:gen"
+
+
+def rules_cache_key(user_id: int, generation: int) -> str:
+    """
+    Cache key for a user's rule list. Always bound to the user's ID.
+
+    Including the generation means a list read before a change can only ever
+    be stored under the old generation's key, which no later read uses.
+    """
+    return f"rules:{user_id}:{generation}"
+
+
+async def get_generation(key: str) -> int | None:
+    """
+    Read a generation counter.
+
+    Returns:
+        The counter (0 if it was never bumped), or None when caching is
+        unavailable and the cache should be bypassed.
+    """
+    if redis_client is None:
+        return None
+    try:
+        value = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+    return int(value) if value is not None else 0
+
+
+async def bump_generation(key: str) -> None:
+    """
+    Increment a generation counter so entries cached under the previous
+    generation are never read again. They expire on their own TTL.
+    """
+    if redis_client is None:
+        return
+    try:
+        await redis_client.incr(key)
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {key}: {str(e)}")
+
+
+async def get_cached(key: str) -> bytes | None:
+    """
+    Fetch a cached value.
+
+    Returns:
+        The cached bytes, or None on a miss or when caching is unavailable.
+    """
+    if redis_client is None:
+        return None
+    try:
+        return await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+
+async def set_cached(key: str, value: bytes, expire: int) -> None:
+    """Store a value for `expire` seconds."""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(key, value, ex=expire)
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def close_cache() -> None:
+    """Close the Redis connection pool on shutdown."""
+    if redis_client is not None:
+        await redis_client.aclose()
@@ -2,28 +2,62 @@
 Application configuration using environment variables.
 """
 
-import os
-from dotenv import load_dotenv
+from typing import Annotated
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
-load_dotenv(".env.local")
 
+class Settings(BaseSettings):
+    """
+    Application settings loaded from environment variables.
+
+    Values are read once from the process environment and `.env.local`
+    when the module is imported; the resulting object is immutable.
+    """
+
+    model_config = SettingsConfigDict(
+        env_file=".env.local",
+        extra="ignore",
+        frozen=True,
+    )
 
-class Settings:
-    """Application settings loaded from environment variables."""
-    
     # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
-    
+    DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_RECYCLE: int = 60  # seconds
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    # Set when connecting through PgBouncer in transaction mode (e.g. Neon's pooled endpoint)
+    DB_PGBOUNCER: bool = False
+
+    # Redis (shared rate limit counters and response cache). Leave unset to
+    # keep rate limit counters in memory and disable response caching.
+    REDIS_URL: str | None = None
+
+    # Text-to-speech device ("cuda" or "cpu"). Unset picks CUDA when available.
+    TTS_DEVICE: str | None = None
+
     # JWT Configuration
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "CHANGE_ME_IN_PRODUCTION_USE_STRONG_SECRET")
+    SECRET_KEY: str = "CHANGE_ME_IN_PRODUCTION_USE_STRONG_SECRET"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 hours default
-    
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours default
+
     # CORS (comma-separated list of allowed origins)
     # Default to localhost for development. Set explicitly in production.
-    _cors_origins_str: str = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8000")
-    CORS_ORIGINS: list[str] = [origin.strip() for origin in _cors_origins_str.split(",")]
+    # Stored as a frozenset so the middleware's origin check is a set lookup.
+    CORS_ORIGINS: Annotated[frozenset[str], NoDecode] = frozenset({
+        "http://localhost:3000",
+        "http://localhost:8000",
+    })
+    CORS_ALLOW_CREDENTIALS: bool = True
 
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
+    def split_cors_origins(cls, v: str | list[str]) -> frozenset[str]:
+        """Split a comma-separated origins string into a normalized set."""
+        if isinstance(v, str):
+            v = v.split(",")
+        return frozenset(origin.strip().lower() for origin in v if origin.strip())
 
-settings = Settings()
 
+settings = Settings()
@@ -2,16 +2,15 @@
 Database configuration and session management for async PostgreSQL.
 """
 
-import os
 import ssl
+from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
-from dotenv import load_dotenv
+from src.config import settings
 
-load_dotenv(".env.local")
-
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.DATABASE_URL
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
@@ -29,14 +28,48 @@ elif DATABASE_URL.startswith("postgresql://"):
 parsed = urlparse(DATABASE_URL)
 clean_url = urlunparse(parsed._replace(query=""))
 
-# Create SSL context for Neon (requires SSL with certificate verification)
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = True
-ssl_context.verify_mode = ssl.CERT_REQUIRED
-# Neon uses standard CA certificates, no custom cert needed
+
+@lru_cache(maxsize=1)
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    Return the process-wide SSL context for Neon connections.
+
+    Neon requires SSL with certificate verification. Building the context
+    parses the system CA bundle, so it is created once and shared by the
+    application engine and Alembic.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = True
+    context.verify_mode = ssl.CERT_REQUIRED
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= ssl.OP_NO_COMPRESSION
+    # Neon uses standard CA certificates, no custom cert needed
+    return context
+
+
+connect_args = {"ssl": get_ssl_context()}
+if settings.DB_PGBOUNCER:
+    # PgBouncer in transaction mode cannot keep prepared statements per connection
+    # and rejects unknown startup parameters. Disable both asyncpg's statement
+    # cache and SQLAlchemy's, and give every prepared statement a unique name
+    # so statements from different clients can't collide on a shared backend.
+    connect_args["statement_cache_size"] = 0
+    connect_args["prepared_statement_cache_size"] = 0
+    connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+else:
+    connect_args["statement_cache_size"] = 1024
+    connect_args["server_settings"] = {"jit": "off"}
 
 engine = create_async_engine(
-    clean_url, echo=False, connect_args={"ssl": ssl_context})
+    clean_url,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=False,
+    connect_args=connect_args,
+)
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -2,55 +2,115 @@
 FastAPI dependencies for authentication and authorization.
 """
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import hashlib
+import time
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.orm import load_only
 from src.database import get_db
 from src.services.auth import decode_access_token
 from src.models.user import User
+from src.schemas.user import TokenData
+
+
+def _credentials_exception() -> HTTPException:
+    """Build the 401 response for a missing, invalid, or expired token."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class BearerToken(HTTPBearer):
+    """
+    HTTP Bearer security scheme that returns the raw token string.
+
+    Registers the same OpenAPI security scheme as HTTPBearer, but parses the
+    Authorization header with a prefix check instead of building an
+    HTTPAuthorizationCredentials model on every request.
+    """
+
+    async def __call__(self, request: Request) -> str:
+        authorization = request.headers.get("authorization", "")
+        # Auth schemes are case-insensitive (RFC 7235), so compare lowercased
+        if authorization[:7].lower() != "bearer ":
+            raise _credentials_exception()
+        return authorization[7:]
+
 
 # HTTP Bearer token security scheme
-security = HTTPBearer()
+bearer_token = BearerToken(scheme_name="HTTPBearer")
+
+# Authorization lookup, built once so requests only bind the user id
+_USER_BY_ID = lambda_stmt(
+    lambda: select(User)
+    .options(load_only(User.id, User.subscription_tier))
+    .where(User.id == bindparam("uid"))
+)
+
+# Short-lived cache of authenticated users, keyed by a hash of the raw token.
+# Values are (detached user, token expiry) so expired tokens are never served
+# from cache. Cached users are shared across requests and must not be
+# added back to a session.
+_user_cache: TTLCache[bytes, tuple[User, int | None]] = TTLCache(maxsize=10000, ttl=30)
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Hash a raw bearer token so the token itself is never kept in memory."""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: str = Depends(bearer_token),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Dependency to get the current authenticated user.
     
     Extracts and validates the JWT token from the Authorization header,
-    then fetches the corresponding user from the database.
+    then fetches the corresponding user from the database. Only the columns
+    needed for authorization (id and subscription_tier) are loaded. Successful
+    lookups are cached for a short TTL so repeated requests with the same
+    token skip both the JWT verification and the database round-trip.
     
     Args:
-        credentials: Bearer token from Authorization header.
+        token: Bearer token from Authorization header.
         db: Database session.
         
     Returns:
-        The authenticated User object.
+        The authenticated User object, with only id and subscription_tier loaded.
         
     Raises:
         HTTPException 401: If token is invalid or user not found.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    token_data = decode_access_token(credentials.credentials)
+    cache_key = _token_cache_key(token)
+    cached = _user_cache.get(cache_key)
+    if cached is not None:
+        user, exp = cached
+        if exp is None or exp > time.time():
+            return user
+        _user_cache.pop(cache_key, None)
+
+    token_data = decode_access_token(token)
     
     if token_data is None or token_data.user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    result = await db.execute(select(User).where(User.id == token_data.user_id))
+    result = await db.execute(_USER_BY_ID, {"uid": token_data.user_id})
     user = result.scalar_one_or_none()
     
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
+    # Detach the user before caching it. A rollback expires every instance
+    # still in the session, which would leave the cached copy unreadable for
+    # later requests; a detached instance keeps its loaded attributes.
+    db.expunge(user)
+    _user_cache[cache_key] = (user, token_data.exp)
     return user
 
 
@@ -76,3 +136,41 @@ async def require_pro_user(
         )
     return current_user
 
+
+
+async def require_pro_from_token(
+    token: str = Depends(bearer_token),
+    db: AsyncSession = Depends(get_db)
+) -> TokenData:
+    """
+    Dependency to ensure the caller has a Pro subscription, trusting the
+    token's tier claim.
+    
+    Tokens carrying tier="pro" are accepted without a database lookup. Tokens
+    without the claim (issued before it existed) or with another tier fall
+    back to loading the user, so an upgrade takes effect before the user
+    gets a new token. A downgrade only takes effect once the user's
+    Pro token expires.
+    
+    Args:
+        token: Bearer token from Authorization header.
+        db: Database session.
+    
+    Returns:
+        The decoded token data, with tier confirmed as Pro.
+    
+    Raises:
+        HTTPException 401: If token is invalid or user not found.
+        HTTPException 403: If the user is not on the Pro tier.
+    """
+    token_data = decode_access_token(token)
+
+    if token_data is None or token_data.user_id is None:
+        raise _credentials_exception()
+
+    if token_data.tier == "pro":
+        return token_data
+
+    current_user = await get_current_user(token, db)
+    await require_pro_user(current_user)
+    return TokenData(user_id=current_user.id, exp=token_data.exp, tier="pro")
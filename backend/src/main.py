@@ -2,21 +2,32 @@
 Main FastAPI application entry point.
 """
 
+import asyncio
+import logging
 import os
 from contextlib import asynccontextmanager
+from io import BytesIO
+from typing import AsyncIterator
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from sqlalchemy import exists, select
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from src.tts.kokoro.utils import text_to_wav, stream_audio_chunks, stream_audio_chunks_mp3
+from src.tts.kokoro.utils import text_to_wav, stream_audio_chunks_mp3, warmup_kokoro
 from src.routers import auth, rules
 from src.config import settings
-from src.dependencies import require_pro_user
+from src.cache import close_cache
+from src.database import engine
+from src.rate_limit import limiter
+from src.dependencies import require_pro_from_token
 from src.models.user import User
+from src.schemas.user import TokenData
+from src.services.auth import enable_legacy_hash_timing
+
+logger = logging.getLogger(__name__)
 
 os.environ["QT_QPA_PLATFORM"] = "offscreen"
 os.environ["DISPLAY"] = ""
@@ -36,8 +47,37 @@ async def lifespan(app: FastAPI):
             "SECRET_KEY must be at least 32 characters for security. "
             "Current length: " + str(len(settings.SECRET_KEY))
         )
+    if "*" in settings.CORS_ORIGINS and settings.CORS_ALLOW_CREDENTIALS:
+        raise ValueError(
+            "CORS_ORIGINS cannot contain '*' while CORS_ALLOW_CREDENTIALS is enabled. "
+            "List the allowed origins explicitly or set CORS_ALLOW_CREDENTIALS=false."
+        )
+
+    # Startup: Warm up the TTS model in a worker thread while opening every
+    # pool slot up front, so the first requests don't pay for model warmup
+    # or the TCP + TLS + auth handshake against the database
+    _, *connections = await asyncio.gather(
+        asyncio.to_thread(warmup_kokoro),
+        *[engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+    )
+    for connection in connections:
+        await connection.close()
+
+    # Startup: Keep login timing uniform while any account still has a
+    # legacy bcrypt hash (see enable_legacy_hash_timing)
+    async with engine.connect() as connection:
+        legacy_hashes = await connection.scalar(
+            select(exists().where(User.hashed_password.like("$2%")))
+        )
+    if legacy_hashes:
+        await asyncio.to_thread(enable_legacy_hash_timing)
+        logger.info("Legacy bcrypt hashes present, equalizing login timing")
+
     yield
-    # Shutdown: cleanup code would go here
+
+    # Shutdown: Close pooled database and cache connections
+    await engine.dispose()
+    await close_cache()
 
 
 app = FastAPI(
@@ -48,7 +88,6 @@ app = FastAPI(
 )
 
 # Configure rate limiting
-limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -56,7 +95,7 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
+    allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -66,6 +105,20 @@ app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(rules.router, prefix="/rules", tags=["Rules"])
 
 
+async def _iter_buffer(
+    buffer: BytesIO, chunk_size: int = 64 * 1024
+) -> AsyncIterator[memoryview]:
+    """
+    Yield zero-copy slices of a BytesIO's contents.
+
+    Async so StreamingResponse iterates it on the event loop; a sync
+    generator would cost a worker-thread round-trip per slice.
+    """
+    view = buffer.getbuffer()
+    for start in range(0, view.nbytes, chunk_size):
+        yield view[start:start + chunk_size]
+
+
 class TextToConvert(BaseModel):
     """Request body for text-to-speech conversion."""
     text: str
@@ -74,24 +127,25 @@ class TextToConvert(BaseModel):
 @app.post("/text", tags=["Text-to-Speech"])
 async def convert_text(
     text_to_convert: TextToConvert,
-    _current_user: User = Depends(require_pro_user)
-) -> Response:
+    _token_data: TokenData = Depends(require_pro_from_token)
+) -> StreamingResponse:
     """
     Convert text to speech and return as WAV audio.
     
     Returns the complete audio file after full generation.
     """
     audio_buffer = text_to_wav(text_to_convert.text)
-    return Response(
-        content=audio_buffer.read(),
+    return StreamingResponse(
+        _iter_buffer(audio_buffer),
         media_type="audio/wav",
+        headers={"Content-Length": str(audio_buffer.getbuffer().nbytes)},
     )
 
 
 @app.post("/stream", tags=["Text-to-Speech"])
 async def stream_text(
     text_to_convert: TextToConvert,
-    _current_user: User = Depends(require_pro_user)
+    _token_data: TokenData = Depends(require_pro_from_token)
 ) -> StreamingResponse:
     """
     Stream text-to-speech audio as MP3 format (128kbps, mono, 24kHz).
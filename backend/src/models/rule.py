@@ -3,7 +3,7 @@ Rule model for storing user-defined extraction rules.
 """
 
 from datetime import datetime
-from sqlalchemy import String, Boolean, ForeignKey, DateTime, func, ARRAY
+from sqlalchemy import String, Boolean, ForeignKey, DateTime, Index, func, ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database import Base
 
@@ -16,9 +16,14 @@ class Rule(Base):
     from specific URL patterns.
     """
     __tablename__ = "rules"
+    __table_args__ = (
+        # Serves the per-user rule listing (WHERE user_id ORDER BY created_at)
+        # and user_id foreign key lookups
+        Index("ix_rules_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     url_pattern: Mapped[str] = mapped_column(String(500), nullable=False)
     keep_selectors: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
     ignore_selectors: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
@@ -36,8 +41,10 @@ class Rule(Base):
         nullable=False
     )
 
-    # Relationship to the user who owns this rule
-    user: Mapped["User"] = relationship("User", back_populates="rules")
+    # Relationship to the user who owns this rule. Never loaded implicitly:
+    # an accidental lazy load per rule would be an N+1 query (and fails under
+    # the async session anyway), so callers must opt in with selectinload().
+    user: Mapped["User"] = relationship("User", back_populates="rules", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<Rule(id={self.id}, url_pattern={self.url_pattern})>"
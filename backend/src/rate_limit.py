@@ -0,0 +1,15 @@
+"""
+Shared rate limiter for the AutoVoice application.
+"""
+
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from src.config import settings
+
+# Counters live in Redis when REDIS_URL is set so limits are enforced across
+# all workers; otherwise each process keeps its own in-memory counters.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.REDIS_URL or "memory://",
+    strategy="moving-window",
+)
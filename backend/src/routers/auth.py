@@ -4,19 +4,34 @@ Authentication router for user signup, login, and profile endpoints.
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from sqlalchemy import bindparam, lambda_stmt, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from src.database import get_db
+from src.rate_limit import limiter
 from src.models.user import User
 from src.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from src.services.auth import hash_password, verify_password, create_access_token
+from src.services.auth import (
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    create_access_token,
+)
 from src.dependencies import get_current_user
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+
+_USER_RESPONSE_ADAPTER = TypeAdapter(UserResponse)
+
+# Login lookups, built once so requests only bind the submitted identifier
+_USER_BY_EMAIL = lambda_stmt(
+    lambda: select(User).where(User.email == bindparam("identifier"))
+)
+_USER_BY_USERNAME = lambda_stmt(
+    lambda: select(User).where(User.username == bindparam("identifier"))
+)
 
 
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
@@ -38,19 +53,33 @@ async def signup(
         f"Signup attempt for username: {user_data.username}, email: {user_data.email}")
 
     try:
-        # Check if username or email already exists
+        # Insert the new user with a hashed password, letting the unique
+        # constraints reject duplicates so the happy path is one round-trip
         result = await db.execute(
-            select(User).where(
-                or_(
-                    User.username == user_data.username,
-                    User.email == user_data.email
-                )
+            insert(User)
+            .values(
+                username=user_data.username,
+                email=user_data.email,
+                hashed_password=await hash_password_async(user_data.password),
+                subscription_tier="free"
             )
+            .on_conflict_do_nothing()
+            .returning(User.id)
         )
-        existing_user = result.scalar_one_or_none()
+        user_id = result.scalar_one_or_none()
+
+        if user_id is None:
+            # Find out which field conflicted. Each branch of the UNION ALL
+            # probes a single unique index instead of OR-ing both.
+            result = await db.execute(
+                select(literal("username")).where(User.username == user_data.username)
+                .union_all(
+                    select(literal("email")).where(User.email == user_data.email)
+                )
+            )
+            conflicts = set(result.scalars().all())
 
-        if existing_user:
-            if existing_user.username == user_data.username:
+            if "username" in conflicts:
                 logger.warning(
                     f"Failed signup attempt - username already exists: {user_data.username}")
                 raise HTTPException(
@@ -64,26 +93,14 @@ async def signup(
                 detail="Email already registered"
             )
 
-        # Create new user with hashed password
-        new_user = User(
-            username=user_data.username,
-            email=user_data.email,
-            hashed_password=hash_password(user_data.password),
-            subscription_tier="free"
-        )
-
-        db.add(new_user)
-        await db.flush()  # Flush to get the user ID
-
         # Generate access token (if this fails, transaction will rollback)
-        access_token = create_access_token(user_id=new_user.id)
+        access_token = create_access_token(user_id=user_id, tier="free")
 
         # Commit transaction only if token generation succeeded
         await db.commit()
-        await db.refresh(new_user)
 
         logger.info(
-            f"Successfully created user: {new_user.username} (ID: {new_user.id})")
+            f"Successfully created user: {user_data.username} (ID: {user_id})")
         return Token(access_token=access_token)
     except HTTPException:
         # Re-raise HTTP exceptions (validation errors)
@@ -115,51 +132,59 @@ async def login(
     """
     logger.info(f"Login attempt for user: {credentials.usernameEmail}")
 
-    # Find user by username or email
-    result = await db.execute(
-        select(User).where(
-            or_(
-                User.username == credentials.usernameEmail,
-                User.email == credentials.usernameEmail
-            )
-        )
-    )
+    # Find user by username or email. Usernames cannot contain "@", so only
+    # the matching unique index needs to be queried.
+    lookup = _USER_BY_EMAIL if "@" in credentials.usernameEmail else _USER_BY_USERNAME
+    result = await db.execute(lookup, {"identifier": credentials.usernameEmail})
     user = result.scalar_one_or_none()
 
-    # Always perform hash comparison to prevent timing attacks
-    # Use a valid bcrypt dummy hash if user doesn't exist (bcrypt hash of "dummy_password")
-    dummy_hash = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5NU8HpbYvb7gO"
-    password_hash = user.hashed_password if user else dummy_hash
+    # Always perform hash comparison to prevent timing attacks. verify_password
+    # checks against a dummy hash when there is no user and, while legacy
+    # bcrypt hashes remain, runs both algorithms so every branch costs the same
+    password_hash = user.hashed_password if user else None
 
     # Perform password verification with error handling
     try:
-        is_valid = verify_password(credentials.password, password_hash)
+        is_valid = await verify_password_async(credentials.password, password_hash)
     except (ValueError, Exception) as e:
         # If password verification fails (e.g., invalid hash format), treat as invalid
         logger.warning(
-            f"Password verification error for {credentials.username}: {str(e)}")
+            f"Password verification error for {credentials.usernameEmail}: {str(e)}")
         is_valid = False
 
     if not user or not is_valid:
-        logger.warning(f"Failed login attempt for: {credentials.username}")
+        logger.warning(f"Failed login attempt for: {credentials.usernameEmail}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Upgrade legacy bcrypt hashes and outdated argon2id parameters while the
+    # plain password is at hand. get_db commits the change.
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(credentials.password)
+        logger.info(f"Rehashed password for user ID: {user.id}")
+
     # Generate access token
-    access_token = create_access_token(user_id=user.id)
+    access_token = create_access_token(user_id=user.id, tier=user.subscription_tier)
 
     logger.info(f"Successful login for user: {user.username} (ID: {user.id})")
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)) -> UserResponse:
+async def get_me(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> UserResponse:
     """
     Get the current authenticated user's profile.
 
     Requires a valid JWT token in the Authorization header.
     """
-    return UserResponse.model_validate(current_user)
+    # get_current_user only loads the columns needed for authorization,
+    # so fetch the full row for the profile response.
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    user = result.scalar_one()
+    return _USER_RESPONSE_ADAPTER.validate_python(user, from_attributes=True)
@@ -4,9 +4,19 @@ Rules router for CRUD operations on user extraction rules.
 All endpoints require authentication and users can only access their own rules.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import NoReturn
+import orjson
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
+from src.cache import (
+    bump_generation,
+    get_cached,
+    get_generation,
+    rules_cache_key,
+    rules_generation_key,
+    set_cached,
+)
 from src.database import get_db
 from src.models.user import User
 from src.models.rule import Rule
@@ -15,21 +25,130 @@ from src.dependencies import require_pro_user
 
 router = APIRouter()
 
+# Rows per multi-row INSERT in bulk creation. Each rule binds 6 parameters,
+# so this stays far below PostgreSQL's 32767 bind parameter limit.
+_BULK_INSERT_BATCH_SIZE = 500
+
+# Seconds a user's serialized rule list stays cached. Mutations bump the
+# generation immediately; the TTL reclaims entries of old generations and
+# bounds staleness if a bump is lost.
+_RULES_CACHE_TTL = 300
+
+
+# RuleResponse fields, copied off Rule rows when building responses
+_RULE_FIELDS = tuple(RuleResponse.model_fields)
+
+
+def _rule_to_dict(rule: Rule) -> dict:
+    """Copy the RuleResponse fields off a Rule row."""
+    return {field: getattr(rule, field) for field in _RULE_FIELDS}
+
+
+def _json_response(content: dict | list[dict], status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Encode rule data with orjson and return it as the response.
+
+    Rows loaded from the database already match RuleResponse, so returning a
+    Response directly skips FastAPI's response_model validation and
+    serialization. The declared response_model still documents the endpoint.
+    Request bodies are still validated.
+    """
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_UTC_Z),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+async def _raise_not_owned(db: AsyncSession, rule_id: int, action: str) -> NoReturn:
+    """
+    Raise the error for a rule that did not match the current user.
+
+    Looks the rule up by ID alone to tell a missing rule (404) from another
+    user's rule (403).
+
+    Raises:
+        HTTPException 404: If the rule does not exist.
+        HTTPException 403: If the rule belongs to another user.
+    """
+    existing_id = await db.scalar(select(Rule.id).where(Rule.id == rule_id))
+    if existing_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rule not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Not authorized to {action} this rule"
+    )
+
+
+async def _get_owned_rule(
+    db: AsyncSession,
+    rule_id: int,
+    user_id: int,
+    action: str
+) -> Rule:
+    """
+    Load a rule owned by the given user.
+
+    Ownership is part of the query, so the common case is a single SELECT.
+
+    Raises:
+        HTTPException 404: If the rule does not exist.
+        HTTPException 403: If the rule belongs to another user.
+    """
+    result = await db.execute(
+        select(Rule).where(Rule.id == rule_id, Rule.user_id == user_id)
+    )
+    rule = result.scalar_one_or_none()
+
+    if rule is None:
+        await _raise_not_owned(db, rule_id, action)
+
+    return rule
+
+
+async def _commit_and_invalidate(db: AsyncSession, user_id: int) -> None:
+    """
+    Commit rule changes, then bump the user's rule list generation.
+
+    A concurrent GET that read the old rows stores them under the previous
+    generation's key, so the stale list is never served after the bump.
+    """
+    await db.commit()
+    await bump_generation(rules_generation_key(user_id))
+
 
 @router.get("", response_model=list[RuleResponse])
 async def get_rules(
     current_user: User = Depends(require_pro_user),
     db: AsyncSession = Depends(get_db)
-) -> list[RuleResponse]:
+) -> Response:
     """
     Get all rules for the authenticated user.
+
+    The serialized list is cached per user and invalidated on every change.
     """
+    # Read the generation before the rows, so a change committed in between
+    # makes this request's cache entry unreachable rather than stale
+    generation = await get_generation(rules_generation_key(current_user.id))
+    cache_key = None
+    if generation is not None:
+        cache_key = rules_cache_key(current_user.id, generation)
+        cached = await get_cached(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
     result = await db.execute(
         select(Rule).where(Rule.user_id == current_user.id).order_by(
             Rule.created_at.desc())
     )
     rules = result.scalars().all()
-    return [RuleResponse.model_validate(rule) for rule in rules]
+    response = _json_response([_rule_to_dict(rule) for rule in rules])
+    if cache_key is not None:
+        await set_cached(cache_key, response.body, _RULES_CACHE_TTL)
+    return response
 
 
 @router.post("", response_model=RuleResponse, status_code=status.HTTP_201_CREATED)
@@ -37,23 +156,54 @@ async def create_rule(
     rule_data: RuleCreate,
     current_user: User = Depends(require_pro_user),
     db: AsyncSession = Depends(get_db)
-) -> RuleResponse:
+) -> Response:
     """
     Create a new rule for the authenticated user.
     """
-    new_rule = Rule(
-        user_id=current_user.id,
-        url_pattern=rule_data.url_pattern,
-        keep_selectors=rule_data.keep_selectors,
-        ignore_selectors=rule_data.ignore_selectors,
-        enabled=rule_data.enabled,
-        auto_extract=rule_data.auto_extract
+    # INSERT ... RETURNING loads the server defaults (id, timestamps) in the
+    # same round trip
+    result = await db.scalars(
+        insert(Rule)
+        .values(user_id=current_user.id, **rule_data.model_dump())
+        .returning(Rule)
     )
-    db.add(new_rule)
-    await db.flush()
-    await db.refresh(new_rule)
+    new_rule = result.one()
+    await _commit_and_invalidate(db, current_user.id)
+
+    return _json_response(_rule_to_dict(new_rule), status_code=status.HTTP_201_CREATED)
+
 
-    return RuleResponse.model_validate(new_rule)
+@router.post("/bulk", response_model=list[RuleResponse], status_code=status.HTTP_201_CREATED)
+async def create_rules_bulk(
+    rules_data: list[RuleCreate] = Body(max_length=5000),
+    current_user: User = Depends(require_pro_user),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Create multiple rules for the authenticated user in one request.
+
+    Rules are written with multi-row INSERT ... RETURNING statements in
+    batches, all inside the request's single transaction.
+    """
+    rows = [
+        {"user_id": current_user.id, **rule_data.model_dump()}
+        for rule_data in rules_data
+    ]
+
+    new_rules: list[Rule] = []
+    for start in range(0, len(rows), _BULK_INSERT_BATCH_SIZE):
+        result = await db.scalars(
+            insert(Rule)
+            .values(rows[start:start + _BULK_INSERT_BATCH_SIZE])
+            .returning(Rule)
+        )
+        new_rules.extend(result.all())
+    await _commit_and_invalidate(db, current_user.id)
+
+    return _json_response(
+        [_rule_to_dict(rule) for rule in new_rules],
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/{rule_id}", response_model=RuleResponse)
@@ -61,26 +211,13 @@ async def get_rule(
     rule_id: int,
     current_user: User = Depends(require_pro_user),
     db: AsyncSession = Depends(get_db)
-) -> RuleResponse:
+) -> Response:
     """
     Get a specific rule by ID (must be owned by the authenticated user).
     """
-    result = await db.execute(select(Rule).where(Rule.id == rule_id))
-    rule = result.scalar_one_or_none()
-
-    if not rule:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rule not found"
-        )
-
-    if rule.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this rule"
-        )
+    rule = await _get_owned_rule(db, rule_id, current_user.id, "access")
 
-    return RuleResponse.model_validate(rule)
+    return _json_response(_rule_to_dict(rule))
 
 
 @router.put("/{rule_id}", response_model=RuleResponse)
@@ -89,34 +226,34 @@ async def update_rule(
     rule_data: RuleUpdate,
     current_user: User = Depends(require_pro_user),
     db: AsyncSession = Depends(get_db)
-) -> RuleResponse:
+) -> Response:
     """
     Update a rule by ID (must be owned by the authenticated user).
     """
-    result = await db.execute(select(Rule).where(Rule.id == rule_id))
-    rule = result.scalar_one_or_none()
-
-    if not rule:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rule not found"
-        )
+    # Update only provided fields, read straight off the validated model
+    # instead of serializing it with model_dump()
+    update_data = {
+        field: getattr(rule_data, field) for field in rule_data.model_fields_set
+    }
+    if not update_data:
+        rule = await _get_owned_rule(db, rule_id, current_user.id, "modify")
+        return _json_response(_rule_to_dict(rule))
 
-    if rule.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this rule"
-        )
-
-    # Update only provided fields
-    update_data = rule_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(rule, field, value)
+    # Ownership is part of the UPDATE, and RETURNING loads the updated row
+    # (including the new updated_at) in the same round trip
+    result = await db.scalars(
+        update(Rule)
+        .where(Rule.id == rule_id, Rule.user_id == current_user.id)
+        .values(**update_data)
+        .returning(Rule)
+    )
+    rule = result.one_or_none()
+    if rule is None:
+        await _raise_not_owned(db, rule_id, "modify")
 
-    await db.flush()
-    await db.refresh(rule)
+    await _commit_and_invalidate(db, current_user.id)
 
-    return RuleResponse.model_validate(rule)
+    return _json_response(_rule_to_dict(rule))
 
 
 @router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -128,19 +265,12 @@ async def delete_rule(
     """
     Delete a rule by ID (must be owned by the authenticated user).
     """
-    result = await db.execute(select(Rule).where(Rule.id == rule_id))
-    rule = result.scalar_one_or_none()
-
-    if not rule:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rule not found"
-        )
-
-    if rule.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this rule"
-        )
+    deleted_id = await db.scalar(
+        delete(Rule)
+        .where(Rule.id == rule_id, Rule.user_id == current_user.id)
+        .returning(Rule.id)
+    )
+    if deleted_id is None:
+        await _raise_not_owned(db, rule_id, "delete")
 
-    await db.delete(rule)
+    await _commit_and_invalidate(db, current_user.id)
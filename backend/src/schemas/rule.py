@@ -3,7 +3,21 @@ Pydantic schemas for rule CRUD operations.
 """
 
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+def _normalize_url_pattern(v: str) -> str:
+    """
+    Canonicalize a URL pattern before it is stored.
+
+    Patterns are matched by the extension as an exact URL or, with a
+    trailing '*', as a URL prefix. Surrounding whitespace can never match a
+    URL, so it is stripped; a pattern that is empty afterwards is rejected.
+    """
+    v = v.strip()
+    if not v:
+        raise ValueError("URL pattern must not be empty")
+    return v
 
 
 class RuleCreate(BaseModel):
@@ -26,6 +40,12 @@ class RuleCreate(BaseModel):
         description="Whether to automatically extract content"
     )
 
+    @field_validator('url_pattern')
+    @classmethod
+    def normalize_url_pattern(cls, v: str) -> str:
+        """Strip and validate the URL pattern."""
+        return _normalize_url_pattern(v)
+
 
 class RuleUpdate(BaseModel):
     """Schema for updating an existing rule."""
@@ -48,6 +68,12 @@ class RuleUpdate(BaseModel):
         description="Whether to automatically extract content"
     )
 
+    @field_validator('url_pattern')
+    @classmethod
+    def normalize_url_pattern(cls, v: str | None) -> str | None:
+        """Strip and validate the URL pattern when it is being changed."""
+        return v if v is None else _normalize_url_pattern(v)
+
 
 class RuleResponse(BaseModel):
     """Schema for rule data in responses."""
@@ -61,5 +87,7 @@ class RuleResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = {"from_attributes": True}
+    # revalidate_instances="never" is pydantic's default; stated explicitly
+    # so instances passed back in are documented as not being re-validated
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
 
@@ -4,8 +4,7 @@ Pydantic schemas for user authentication.
 
 from datetime import datetime
 from typing import Literal
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from zxcvbn import zxcvbn
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 class UserCreate(BaseModel):
@@ -27,6 +26,10 @@ class UserCreate(BaseModel):
     @classmethod
     def validate_password_strength(cls, v: str) -> str:
         """Validate password strength using zxcvbn."""
+        # Imported lazily: loading zxcvbn's frequency lists is slow and only
+        # signups need it
+        from zxcvbn import zxcvbn
+
         result = zxcvbn(v)
         if result['score'] < 2:  # 0-4 scale, require at least 2 (fair)
             feedback = result.get('feedback', {})
@@ -63,7 +66,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    model_config = {"from_attributes": True}
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
 
 
 class Token(BaseModel):
@@ -75,3 +78,5 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     """Schema for decoded JWT token data."""
     user_id: int | None = None
+    exp: int | None = None
+    tier: SubscriptionTier | None = None  # absent on tokens issued before the claim existed
@@ -5,6 +5,9 @@ Business logic services.
 from src.services.auth import (
     hash_password,
     verify_password,
+    password_needs_rehash,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     decode_access_token
 )
@@ -12,6 +15,9 @@ from src.services.auth import (
 __all__ = [
     "hash_password",
     "verify_password", 
+    "password_needs_rehash",
+    "hash_password_async",
+    "verify_password_async",
     "create_access_token",
     "decode_access_token"
 ]
@@ -2,16 +2,45 @@
 Authentication services for password hashing and JWT token management.
 """
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 import bcrypt
-from jose import JWTError, jwt
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
 from src.config import settings
-from src.schemas.user import TokenData
+from src.schemas.user import SubscriptionTier, TokenData
+
+# Password hashing is CPU-bound and releases the GIL, so run it on a dedicated
+# pool rather than blocking the event loop or the default executor
+_HASH_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash"
+)
+
+# argon2id with the OWASP-recommended minimum parameters (19 MiB, 2 iterations)
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Verified against when a login names an unknown user, so both branches
+# take the same time. Computed once at import.
+_DUMMY_HASH = _password_hasher.hash("dummy_password")
+
+# bcrypt counterpart of _DUMMY_HASH, set by enable_legacy_hash_timing() while
+# legacy bcrypt hashes remain in the users table
+_bcrypt_dummy_hash: bytes | None = None
+
+# JWT signing parameters, resolved once since settings are immutable
+_SECRET = settings.SECRET_KEY.encode("utf-8")
+_ALG = settings.ALGORITHM
+_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
 
 def hash_password(password: str) -> str:
     """
-    Hash a plain text password using bcrypt.
+    Hash a plain text password using argon2id.
     
     Args:
         password: Plain text password to hash.
@@ -19,50 +48,150 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string.
     """
-    password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode("utf-8")
+    return _password_hasher.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def enable_legacy_hash_timing() -> None:
+    """
+    Equalize login timing while legacy bcrypt hashes are still stored.
+    
+    bcrypt at the legacy cost is far slower than argon2id, so verifying only
+    the stored hash would reveal which accounts exist (and which are
+    legacy) by response time. Once enabled, every verification runs both
+    algorithms, one of them against a dummy hash, so unknown users, bcrypt
+    accounts and argon2id accounts all take the same time. Call at startup
+    when any bcrypt hash remains.
+    """
+    global _bcrypt_dummy_hash
+    # bcrypt.gensalt()'s default cost is the one legacy hashes were created with
+    _bcrypt_dummy_hash = bcrypt.hashpw(b"dummy_password", bcrypt.gensalt())
+
+
+def _verify_argon2(hashed_password: str, plain_password: str) -> bool:
+    """Verify against an argon2id hash, returning False on mismatch."""
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except VerifyMismatchError:
+        return False
+
+
+def verify_password(plain_password: str, hashed_password: str | None) -> bool:
     """
     Verify a plain text password against a hashed password.
     
+    Accepts argon2id hashes as well as legacy bcrypt hashes created before
+    the switch to argon2id. After enable_legacy_hash_timing(), the algorithm
+    not used by the stored hash is also run against a dummy hash.
+    
     Args:
         plain_password: Plain text password to verify.
-        hashed_password: Hashed password to compare against.
+        hashed_password: Hashed password to compare against, or None to
+            verify against a dummy hash (always returns False).
         
     Returns:
         True if password matches, False otherwise.
     """
+    bcrypt_dummy_hash = _bcrypt_dummy_hash
     password_bytes = plain_password.encode("utf-8")
-    hashed_bytes = hashed_password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+    if hashed_password is None:
+        _verify_argon2(_DUMMY_HASH, plain_password)
+        if bcrypt_dummy_hash is not None:
+            bcrypt.checkpw(password_bytes[:72], bcrypt_dummy_hash)
+        return False
+
+    if hashed_password.startswith("$2"):
+        hashed_bytes = hashed_password.encode("utf-8")
+        is_valid = bcrypt.checkpw(password_bytes, hashed_bytes)
+        if bcrypt_dummy_hash is not None:
+            _verify_argon2(_DUMMY_HASH, plain_password)
+        return is_valid
+
+    is_valid = _verify_argon2(hashed_password, plain_password)
+    if bcrypt_dummy_hash is not None:
+        # bcrypt rejects passwords over 72 bytes; the dummy only costs time
+        bcrypt.checkpw(password_bytes[:72], bcrypt_dummy_hash)
+    return is_valid
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash should be replaced on the next successful login.
+    
+    Legacy bcrypt hashes always need rehashing, as do argon2id hashes created
+    with parameters other than the current ones.
+    
+    Args:
+        hashed_password: The stored password hash.
+        
+    Returns:
+        True if the password should be rehashed, False otherwise.
+    """
+    if hashed_password.startswith("$2"):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the hashing thread pool without blocking the event loop.
+    
+    Args:
+        password: Plain text password to hash.
+        
+    Returns:
+        Hashed password string.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_HASH_POOL, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str | None) -> bool:
+    """
+    Verify a password on the hashing thread pool without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password to verify.
+        hashed_password: Hashed password to compare against, or None to
+            verify against a dummy hash.
+        
+    Returns:
+        True if password matches, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _HASH_POOL, verify_password, plain_password, hashed_password
+    )
 
 
-def create_access_token(user_id: int, expires_delta: timedelta | None = None) -> str:
+def create_access_token(
+    user_id: int,
+    tier: SubscriptionTier,
+    expires_delta: timedelta | None = None
+) -> str:
     """
     Create a JWT access token for a user.
     
     Args:
         user_id: The user's database ID to encode in the token.
+        tier: The user's subscription tier, embedded as the "tier" claim.
         expires_delta: Optional custom expiration time.
         
     Returns:
         Encoded JWT token string.
     """
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + _EXPIRE_SECONDS
     
     to_encode = {
         "sub": str(user_id),
+        "tier": tier,
         "exp": expire
     }
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET, algorithm=_ALG)
     return encoded_jwt
 
 
@@ -74,17 +203,21 @@ def decode_access_token(token: str) -> TokenData | None:
         token: The JWT token string to decode.
         
     Returns:
-        TokenData with user_id if valid, None if invalid or expired.
+        TokenData with user_id, expiry and tier if valid, None if invalid or expired.
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _SECRET, algorithms=[_ALG])
         user_id_str: str | None = payload.get("sub")
         
         if user_id_str is None:
             return None
             
-        return TokenData(user_id=int(user_id_str))
+        return TokenData(
+            user_id=int(user_id_str),
+            exp=payload.get("exp"),
+            tier=payload.get("tier")
+        )
         
-    except JWTError:
+    except jwt.InvalidTokenError:
         return None
 
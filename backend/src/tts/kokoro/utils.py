@@ -1,11 +1,11 @@
 from kokoro import KPipeline
-import soundfile as sf
+import lameenc
 import warnings
 import numpy as np
 import struct
 from io import BytesIO
 from typing import Generator
-from pydub import AudioSegment
+from src.config import settings
 
 # Suppress PyTorch deprecation/config warnings from kokoro's dependencies
 warnings.filterwarnings("ignore", message=".*dropout option adds dropout.*")
@@ -13,19 +13,29 @@ warnings.filterwarnings("ignore", message=".*weight_norm.*is deprecated.*")
 
 SAMPLE_RATE = 24000
 
-pipeline = KPipeline(lang_code="a")
+# Run inference on the GPU when one is available. Kokoro moves each chunk's
+# audio back to the host itself, so int16 conversion always happens on CPU.
+pipeline = KPipeline(lang_code="a", device=settings.TTS_DEVICE)
 
 
-def create_wav_header(sample_rate: int = 24000, bits_per_sample: int = 16, channels: int = 1) -> bytes:
+def create_wav_header(
+    sample_rate: int = 24000,
+    bits_per_sample: int = 16,
+    channels: int = 1,
+    data_size: int | None = None,
+) -> bytes:
     """
-    Create a WAV header for streaming. Uses max size (0xFFFFFFFF) to allow
-    browsers to play audio as it streams in.
+    Create a WAV header. Without data_size, uses max size (0xFFFFFFFF) to
+    allow browsers to play audio as it streams in.
     """
     byte_rate = sample_rate * channels * bits_per_sample // 8
     block_align = channels * bits_per_sample // 8
-    # Use max uint32 for unknown length streaming
-    data_size = 0xFFFFFFFF - 36
-    file_size = 0xFFFFFFFF
+    if data_size is None:
+        # Use max uint32 for unknown length streaming
+        data_size = 0xFFFFFFFF - 36
+        file_size = 0xFFFFFFFF
+    else:
+        file_size = data_size + 36
 
     header = struct.pack(
         '<4sI4s4sIHHIIHH4sI',
@@ -46,34 +56,72 @@ def create_wav_header(sample_rate: int = 24000, bits_per_sample: int = 16, chann
     return header
 
 
+# Streaming header for Kokoro's output format, built once at import
+_DEFAULT_WAV_HEADER = create_wav_header(SAMPLE_RATE)
+
+
+def _to_pcm16(
+    audio_np: np.ndarray, scratch: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert float audio to int16 PCM in a single fused pass.
+
+    Clips `audio_np` to [-1, 1] in place so overshoot can't wrap around, then
+    writes into `scratch`, growing it when the chunk is longer. Returns the
+    PCM view for this chunk and the (possibly new) scratch buffer to reuse.
+    Each stream keeps its own scratch since streams run concurrently. Without
+    a scratch, a fresh array is returned that the caller may hand off.
+    """
+    np.clip(audio_np, -1.0, 1.0, out=audio_np)
+    n = audio_np.shape[0]
+    if scratch is None or scratch.shape[0] < n:
+        scratch = np.empty(n, dtype=np.int16)
+    pcm = scratch[:n]
+    np.multiply(audio_np, 32767.0, out=pcm, casting="unsafe")
+    return pcm, scratch
+
+
 def text_to_wav(text: str, voice: str = "af_bella", speed: float = 1.0) -> BytesIO:
     generator = pipeline(text, voice=voice, speed=speed)
 
     buffer = BytesIO()
     for _, _, audio in generator:
-        sf.write(buffer, audio, SAMPLE_RATE, format="WAV")
+        pcm, _ = _to_pcm16(audio.numpy(force=True))
+        buffer.write(create_wav_header(SAMPLE_RATE, data_size=pcm.nbytes))
+        buffer.write(pcm)
         break
 
     buffer.seek(0)
     return buffer
 
 
+def warmup_kokoro() -> None:
+    """
+    Run a tiny synthesis so the first real request doesn't pay for loading
+    the default voice and the first pass through the model.
+    Blocking; call from a worker thread.
+    """
+    text_to_wav("Hi.")
+
+
 def stream_audio_chunks(
     text: str, voice: str = "af_bella", speed: float = 1.0
-) -> Generator[bytes, None, None]:
+) -> Generator[bytes | memoryview, None, None]:
     """
     Stream audio as WAV format. Sends header first, then PCM chunks.
     Playable directly in browsers.
     """
     # Send WAV header first
-    yield create_wav_header(SAMPLE_RATE)
+    yield _DEFAULT_WAV_HEADER
 
     generator = pipeline(text, voice=voice, speed=speed)
     for i, (gs, ps, audio) in enumerate(generator):
-        # Convert PyTorch tensor to numpy, then to int16 PCM
-        audio_np = audio.cpu().numpy() if hasattr(audio, 'cpu') else audio
-        audio_int16 = (audio_np * 32767).astype(np.int16)
-        yield audio_int16.tobytes()
+        # Convert PyTorch tensor to numpy, then to int16 PCM. Each chunk gets
+        # its own array: the server may still hold the yielded view in its
+        # write buffer, so it can't be reused for the next chunk.
+        audio_int16, _ = _to_pcm16(audio.numpy(force=True))
+        # Yield the array's bytes as a view instead of copying via tobytes()
+        yield audio_int16.data.cast("B")
 
 
 def stream_audio_chunks_mp3(
@@ -83,24 +131,31 @@ def stream_audio_chunks_mp3(
     Stream audio as MP3 format for MediaSource API compatibility.
     Yields MP3-encoded audio chunks suitable for progressive streaming.
     """
+    # One in-process encoder per stream: LAME keeps state between chunks, so
+    # concurrent streams can't share an encoder.
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(128)
+    encoder.set_in_sample_rate(SAMPLE_RATE)
+    encoder.set_channels(1)
+    encoder.set_quality(5)
+
     generator = pipeline(text, voice=voice, speed=speed)
+    scratch = np.empty(0, dtype=np.int16)
+    encoded = False
 
     for i, (gs, ps, audio) in enumerate(generator):
-        # Convert PyTorch tensor to numpy array
-        audio_np = audio.cpu().numpy() if hasattr(audio, 'cpu') else audio
-        audio_int16 = (audio_np * 32767).astype(np.int16)
-
-        # Create AudioSegment from raw PCM data
-        audio_segment = AudioSegment(
-            audio_int16.tobytes(),
-            frame_rate=SAMPLE_RATE,  # 24000 Hz
-            sample_width=2,          # 16-bit = 2 bytes
-            channels=1               # mono
-        )
-
-        # Export as MP3 chunk
-        mp3_buffer = BytesIO()
-        audio_segment.export(mp3_buffer, format="mp3", bitrate="128k")
-        mp3_buffer.seek(0)
-
-        yield mp3_buffer.read()
+        # Convert PyTorch tensor to int16 PCM
+        audio_int16, scratch = _to_pcm16(audio.numpy(force=True), scratch)
+        encoded = True
+
+        # LAME buffers partial frames, so a chunk may encode to nothing yet
+        mp3_chunk = encoder.encode(audio_int16.tobytes())
+        if mp3_chunk:
+            yield bytes(mp3_chunk)
+
+    # Emit the frames still buffered in the encoder (flush raises if
+    # nothing was ever encoded)
+    if encoded:
+        mp3_tail = encoder.flush()
+        if mp3_tail:
+            yield bytes(mp3_tail)